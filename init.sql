@@ -1,7 +1,8 @@
 -- Initialize database for legal snippets
 CREATE EXTENSION IF NOT EXISTS vector;
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 
--- Legal snippets table with vector embeddings
+-- Legal snippets table
 CREATE TABLE IF NOT EXISTS legal_snippets (
     id SERIAL PRIMARY KEY,
     citation TEXT NOT NULL,
@@ -11,9 +12,27 @@ CREATE TABLE IF NOT EXISTS legal_snippets (
     case_type TEXT DEFAULT 'civil',
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    citation_embedding vector(384),
-    key_language_embedding vector(384),
-    combined_embedding vector(384)
+    search_tsv tsvector GENERATED ALWAYS AS (
+        to_tsvector('english', coalesce(citation, '') || ' ' ||
+                    coalesce(key_language, '') || ' ' || coalesce(context, ''))
+    ) STORED
+);
+
+-- Snippet embeddings, kept out of legal_snippets so vector index scans
+-- fetch narrow rows
+CREATE TABLE IF NOT EXISTS legal_snippet_embeddings (
+    snippet_id INTEGER PRIMARY KEY REFERENCES legal_snippets(id) ON DELETE CASCADE,
+    combined_embedding halfvec(384) NOT NULL
+);
+
+-- Snippet text embeddings keyed by content hash so repeated texts skip
+-- the model (search queries are only cached in memory)
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    hash BYTEA NOT NULL,
+    model TEXT NOT NULL,
+    embedding halfvec(384) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (hash, model)
 );
 
 -- Create indexes for better performance
@@ -23,7 +42,16 @@ ON legal_snippets USING GIN(tags);
 CREATE INDEX IF NOT EXISTS idx_legal_snippets_case_type 
 ON legal_snippets(case_type);
 
--- Vector similarity indexes (will be created after some data is inserted)
--- CREATE INDEX IF NOT EXISTS idx_legal_snippets_combined_embedding 
--- ON legal_snippets USING ivfflat (combined_embedding vector_cosine_ops)
--- WITH (lists = 100);
\ No newline at end of file
+-- Full-text search, with trigram matching for citation substrings
+CREATE INDEX IF NOT EXISTS idx_legal_snippets_search_tsv 
+ON legal_snippets USING GIN(search_tsv);
+
+CREATE INDEX IF NOT EXISTS idx_legal_snippets_citation_trgm 
+ON legal_snippets USING GIN(citation gin_trgm_ops);
+
+-- HNSW vector similarity index (no training step, so it can be built on
+-- an empty table and stays accurate as snippets are inserted). Embeddings
+-- are unit length, so inner product ranks the same as cosine distance.
+CREATE INDEX IF NOT EXISTS idx_legal_snippet_embeddings_combined_embedding
+ON legal_snippet_embeddings USING hnsw (combined_embedding halfvec_ip_ops)
+WITH (m = 16, ef_construction = 64);
@@ -1,80 +1,199 @@
 from fastmcp import FastMCP
 import json
 import os
+import sqlite3
+import threading
 from datetime import datetime
 from typing import List, Dict, Optional
 
 # Initialize the MCP server
 mcp = FastMCP("Legal Research Snippets")
 
-# Helper function to load/save data
+# SQLite database file, and the JSON file earlier versions stored snippets in
+SNIPPETS_DB = os.getenv("LEGAL_SNIPPETS_DB", "legal_snippets.db")
+LEGACY_JSON_FILE = "legal_snippets.json"
+
+# Open connections keyed by database path
+_connections: Dict[str, sqlite3.Connection] = {}
+_write_lock = threading.Lock()
+
+def get_db() -> sqlite3.Connection:
+    """Get the SQLite connection, creating the schema on first use"""
+    conn = _connections.get(SNIPPETS_DB)
+    if conn is None:
+        conn = sqlite3.connect(SNIPPETS_DB, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        # WAL lets reads proceed during writes; NORMAL skips an fsync per commit
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _create_schema(conn)
+        _connections[SNIPPETS_DB] = conn
+    return conn
+
+def _create_schema(conn: sqlite3.Connection):
+    """Create tables, the full-text index and its sync triggers"""
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= 1:
+        return
+
+    try:
+        conn.executescript("""
+            BEGIN IMMEDIATE;
+
+            CREATE TABLE IF NOT EXISTS snippets (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                citation TEXT NOT NULL,
+                key_language TEXT NOT NULL,
+                tags TEXT NOT NULL DEFAULT '[]',
+                context TEXT DEFAULT '',
+                case_type TEXT DEFAULT 'civil',
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            );
+
+            -- Trigram tokens give case-insensitive substring matching, like the
+            -- old in-memory search, but served from an index
+            CREATE VIRTUAL TABLE IF NOT EXISTS snippets_fts USING fts5(
+                citation, key_language, context,
+                content='snippets', content_rowid='id', tokenize='trigram'
+            );
+
+            CREATE TRIGGER IF NOT EXISTS snippets_ai AFTER INSERT ON snippets BEGIN
+                INSERT INTO snippets_fts (rowid, citation, key_language, context)
+                VALUES (new.id, new.citation, new.key_language, new.context);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS snippets_ad AFTER DELETE ON snippets BEGIN
+                INSERT INTO snippets_fts (snippets_fts, rowid, citation, key_language, context)
+                VALUES ('delete', old.id, old.citation, old.key_language, old.context);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS snippets_au AFTER UPDATE ON snippets BEGIN
+                INSERT INTO snippets_fts (snippets_fts, rowid, citation, key_language, context)
+                VALUES ('delete', old.id, old.citation, old.key_language, old.context);
+                INSERT INTO snippets_fts (rowid, citation, key_language, context)
+                VALUES (new.id, new.citation, new.key_language, new.context);
+            END;
+        """)
+
+        # Carry over snippets saved by the JSON-file version. This shares the
+        # schema transaction, so a failed import is retried on the next start
+        if os.path.exists(LEGACY_JSON_FILE):
+            with open(LEGACY_JSON_FILE, 'r') as f:
+                _insert_all(conn, json.load(f))
+        conn.execute("PRAGMA user_version = 1")
+        conn.execute("COMMIT")
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+
+def _row_to_snippet(row: sqlite3.Row) -> Dict:
+    """Convert a snippets row into the snippet dict returned by the tools"""
+    snippet = dict(row)
+    snippet["tags"] = json.loads(snippet["tags"])
+    return snippet
+
+def _insert_all(conn: sqlite3.Connection, data: Dict):
+    """Replace every stored snippet within the caller's transaction"""
+    now = datetime.now().isoformat()
+    conn.execute("DELETE FROM snippets")
+    conn.executemany("""
+        INSERT INTO snippets
+        (id, citation, key_language, tags, context, case_type, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, [
+        (s["id"], s["citation"], s["key_language"], json.dumps(s.get("tags", [])),
+         s.get("context", ""), s.get("case_type", "civil"),
+         s.get("created_at", now), s.get("updated_at", now))
+        for s in data.get("snippets", [])
+    ])
+    # Keep handing out ids from where the saved data left off
+    conn.execute("DELETE FROM sqlite_sequence WHERE name = 'snippets'")
+    conn.execute(
+        "INSERT INTO sqlite_sequence (name, seq) VALUES ('snippets', ?)",
+        (data.get("next_id", 1) - 1,)
+    )
+
+def _replace_all(conn: sqlite3.Connection, data: Dict):
+    """Replace every stored snippet with those in a {"snippets", "next_id"} dict"""
+    with _write_lock:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            _insert_all(conn, data)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+# Whole-collection helpers, used for backups and by the test script
 def load_snippets():
-    if os.path.exists('legal_snippets.json'):
-        with open('legal_snippets.json', 'r') as f:
-            return json.load(f)
-    return {"snippets": [], "next_id": 1}
+    conn = get_db()
+    rows = conn.execute("SELECT * FROM snippets ORDER BY id").fetchall()
+    seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'snippets'").fetchone()
+    return {"snippets": [_row_to_snippet(row) for row in rows], "next_id": (seq[0] if seq else 0) + 1}
 
 def save_snippets(data):
-    with open('legal_snippets.json', 'w') as f:
-        json.dump(data, f, indent=2)
+    _replace_all(get_db(), data)
 
 @mcp.tool()
 def create_snippet(
-    citation: str, 
-    key_language: str, 
-    tags: List[str], 
+    citation: str,
+    key_language: str,
+    tags: List[str],
     context: str = "",
     case_type: str = "civil"
 ) -> Dict:
     """Create a new legal research snippet with metadata"""
-    data = load_snippets()
-    
-    snippet = {
-        "id": data["next_id"],
-        "citation": citation,
-        "key_language": key_language,
-        "tags": tags,
-        "context": context,
-        "case_type": case_type,
-        "created_at": datetime.now().isoformat(),
-        "updated_at": datetime.now().isoformat()
-    }
-    
-    data["snippets"].append(snippet)
-    data["next_id"] += 1
-    save_snippets(data)
-    
-    return {"status": "success", "snippet_id": snippet["id"], "message": f"Created snippet {snippet['id']} for {citation}"}
+    now = datetime.now().isoformat()
+    cursor = get_db().execute("""
+        INSERT INTO snippets
+        (citation, key_language, tags, context, case_type, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, (citation, key_language, json.dumps(tags), context, case_type, now, now))
+    snippet_id = cursor.lastrowid
+
+    return {"status": "success", "snippet_id": snippet_id, "message": f"Created snippet {snippet_id} for {citation}"}
 
 @mcp.tool()
 def search_snippets(query: str = "", tags: Optional[List[str]] = None) -> List[Dict]:
     """Search snippets by text content or tags"""
-    data = load_snippets()
-    results = []
-    
-    for snippet in data["snippets"]:
-        # Text search
-        if query and (query.lower() in snippet["citation"].lower() or 
-                     query.lower() in snippet["key_language"].lower() or
-                     query.lower() in snippet.get("context", "").lower()):
-            results.append(snippet)
-        # Tag search
-        elif tags and any(tag in snippet["tags"] for tag in tags):
-            results.append(snippet)
-        # Return all if no search criteria
-        elif not query and not tags:
-            results.append(snippet)
-    
-    return results
+    conditions = []
+    params = []
+
+    # Text search
+    if query:
+        if len(query) >= 3:
+            # Quote as a phrase so the query is matched literally
+            conditions.append("id IN (SELECT rowid FROM snippets_fts WHERE snippets_fts MATCH ?)")
+            params.append('"' + query.replace('"', '""') + '"')
+        else:
+            # Trigram index needs at least three characters; escape LIKE
+            # wildcards so the query is matched literally
+            pattern = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            conditions.append(
+                "(citation LIKE ? ESCAPE '\\' OR key_language LIKE ? ESCAPE '\\'"
+                " OR context LIKE ? ESCAPE '\\')"
+            )
+            params.extend([f"%{pattern}%"] * 3)
+
+    # Tag search
+    if tags:
+        conditions.append("""EXISTS (
+            SELECT 1 FROM json_each(snippets.tags)
+            WHERE json_each.value IN (SELECT value FROM json_each(?))
+        )""")
+        params.append(json.dumps(tags))
+
+    # Return all if no search criteria
+    where = f"WHERE {' OR '.join(conditions)}" if conditions else ""
+    rows = get_db().execute(f"SELECT * FROM snippets {where} ORDER BY id", params).fetchall()
+    return [_row_to_snippet(row) for row in rows]
 
 @mcp.tool()
 def get_snippet(snippet_id: int) -> Optional[Dict]:
     """Retrieve a specific snippet by ID"""
-    data = load_snippets()
-    for snippet in data["snippets"]:
-        if snippet["id"] == snippet_id:
-            return snippet
-    return None
+    row = get_db().execute("SELECT * FROM snippets WHERE id = ?", (snippet_id,)).fetchone()
+    return _row_to_snippet(row) if row else None
 
 @mcp.tool()
 def update_snippet(
@@ -86,52 +205,50 @@ def update_snippet(
     case_type: Optional[str] = None
 ) -> Dict:
     """Update an existing snippet"""
-    data = load_snippets()
-    
-    for snippet in data["snippets"]:
-        if snippet["id"] == snippet_id:
-            if citation: snippet["citation"] = citation
-            if key_language: snippet["key_language"] = key_language
-            if tags: snippet["tags"] = tags
-            if context: snippet["context"] = context
-            if case_type: snippet["case_type"] = case_type
-            snippet["updated_at"] = datetime.now().isoformat()
-            
-            save_snippets(data)
-            return {"status": "success", "message": f"Updated snippet {snippet_id}"}
-    
+    # Empty values leave the current field unchanged
+    cursor = get_db().execute("""
+        UPDATE snippets
+        SET citation = COALESCE(?, citation), key_language = COALESCE(?, key_language),
+            tags = COALESCE(?, tags), context = COALESCE(?, context),
+            case_type = COALESCE(?, case_type), updated_at = ?
+        WHERE id = ?
+    """, (citation or None, key_language or None, json.dumps(tags) if tags else None,
+          context or None, case_type or None, datetime.now().isoformat(), snippet_id))
+
+    if cursor.rowcount:
+        return {"status": "success", "message": f"Updated snippet {snippet_id}"}
+
     return {"status": "error", "message": f"Snippet {snippet_id} not found"}
 
 @mcp.tool()
 def delete_snippet(snippet_id: int) -> Dict:
     """Delete a snippet by ID"""
-    data = load_snippets()
-    original_count = len(data["snippets"])
-    data["snippets"] = [s for s in data["snippets"] if s["id"] != snippet_id]
-    
-    if len(data["snippets"]) < original_count:
-        save_snippets(data)
+    cursor = get_db().execute("DELETE FROM snippets WHERE id = ?", (snippet_id,))
+
+    if cursor.rowcount:
         return {"status": "success", "message": f"Deleted snippet {snippet_id}"}
-    
+
     return {"status": "error", "message": f"Snippet {snippet_id} not found"}
 
 @mcp.tool()
 def list_tags() -> List[str]:
     """Get all unique tags from the snippet collection"""
-    data = load_snippets()
-    all_tags = set()
-    for snippet in data["snippets"]:
-        all_tags.update(snippet.get("tags", []))
-    return sorted(list(all_tags))
+    rows = get_db().execute("""
+        SELECT DISTINCT json_each.value AS tag
+        FROM snippets, json_each(snippets.tags)
+        ORDER BY tag
+    """).fetchall()
+    return [row["tag"] for row in rows]
 
 @mcp.tool()
 def export_snippets(format: str = "json") -> str:
     """Export all snippets in specified format (json or text)"""
-    data = load_snippets()
-    
+    rows = get_db().execute("SELECT * FROM snippets ORDER BY id")
+
     if format == "text":
         result = []
-        for snippet in data["snippets"]:
+        for row in rows:
+            snippet = _row_to_snippet(row)
             result.append(f"Citation: {snippet['citation']}\n")
             result.append(f"Key Language: {snippet['key_language']}\n")
             result.append(f"Tags: {', '.join(snippet['tags'])}\n")
@@ -141,13 +258,15 @@ def export_snippets(format: str = "json") -> str:
             result.append("-" * 50 + "\n")
         return "".join(result)
     else:
-        return json.dumps(data["snippets"], indent=2)
+        return json.dumps([_row_to_snippet(row) for row in rows], indent=2)
 
 @mcp.resource("schema://legal_snippets")
 def get_schema() -> str:
     """Provide information about the snippet data structure"""
     return """Legal Snippets Schema:
-    
+
+    Stored in a local SQLite database (legal_snippets.db) with a full-text index
+
     - id: Unique identifier
     - citation: Case citation (e.g., "Smith v. Jones, 123 F.3d 456 (2nd Cir. 2023)")
     - key_language: Important legal text from the case
@@ -159,4 +278,4 @@ def get_schema() -> str:
     """
 
 if __name__ == "__main__":
-    mcp.run()
\ No newline at end of file
+    mcp.run()
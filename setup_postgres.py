@@ -31,62 +31,43 @@ async def check_pgvector_availability():
 async def setup_database():
     """Initialize the database with tables and indexes"""
     database_url = os.getenv("DATABASE_URL", DEFAULT_DATABASE_URL)
+    pool = None
     
     try:
+        from legal_snippets_postgres_server import bootstrap_schema, create_db_pool
+        
         print("🔗 Connecting to PostgreSQL...")
         conn = await asyncpg.connect(database_url)
         
-        print("📦 Installing pgvector extension...")
-        await conn.execute("CREATE EXTENSION IF NOT EXISTS vector;")
+        print("🗄️  Creating tables and indexes...")
+        try:
+            params = await bootstrap_schema(conn)
+        finally:
+            await conn.close()
+        print(f"🕸️  HNSW indexes use m={params['m']}, "
+              f"ef_construction={params['ef_construction']}, ef_search={params['ef_search']}")
         
-        print("🗄️  Creating legal_snippets table...")
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS legal_snippets (
-                id SERIAL PRIMARY KEY,
-                citation TEXT NOT NULL,
-                key_language TEXT NOT NULL,
-                tags TEXT[] NOT NULL DEFAULT '{}',
-                context TEXT DEFAULT '',
-                case_type TEXT DEFAULT 'civil',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                citation_embedding vector(384),
-                key_language_embedding vector(384),
-                combined_embedding vector(384)
-            );
-        """)
-        
-        print("📊 Creating indexes...")
-        await conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_legal_snippets_tags 
-            ON legal_snippets USING GIN(tags);
-        """)
-        
-        await conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_legal_snippets_case_type 
-            ON legal_snippets(case_type);
-        """)
-        
-        await conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_legal_snippets_combined_embedding 
-            ON legal_snippets USING ivfflat (combined_embedding vector_cosine_ops)
-            WITH (lists = 100);
-        """)
+        # The server's pool prepares its hot statements on every connection,
+        # so opening one with its settings checks that the schema matches
+        print("🏊 Warming up connection pool...")
+        pool = await create_db_pool(database_url, params["ef_search"])
         
         print("✅ Database setup completed successfully!")
         
         # Show table info
-        result = await conn.fetchval("""
-            SELECT COUNT(*) FROM legal_snippets
-        """)
+        async with pool.acquire() as conn:
+            result = await conn.fetchval("""
+                SELECT COUNT(*) FROM legal_snippets
+            """)
         print(f"📈 Current snippets in database: {result}")
-        
-        await conn.close()
         return True
         
     except Exception as e:
         print(f"❌ Database setup failed: {e}")
         return False
+    finally:
+        if pool is not None:
+            await pool.close()
 
 async def test_embeddings():
     """Test that sentence transformers work correctly"""
@@ -114,8 +95,26 @@ DATABASE_URL={DEFAULT_DATABASE_URL}
 # Optional: Customize embedding model
 EMBEDDING_MODEL=all-MiniLM-L6-v2
 
+# Optional: Run the embedding model with INT8 quantization on CPU
+# EMBEDDING_QUANTIZE=int8
+
 # Optional: Set similarity threshold for searches
 DEFAULT_SIMILARITY_THRESHOLD=0.7
+
+# Optional: Connection pool sizing
+# DB_POOL_MIN_SIZE=4
+# DB_POOL_MAX_SIZE=32
+
+# Optional: Pin HNSW vector index parameters (chosen from collection size otherwise)
+# HNSW_M=16
+# HNSW_EF_CONSTRUCTION=64
+# HNSW_EF_SEARCH=40
+
+# Optional: Parallel workers per query (set on the database at startup)
+# PARALLEL_WORKERS_PER_GATHER=4
+
+# Optional: Directory export_snippets writes files to (system temp directory by default)
+# EXPORT_DIR=/path/to/exports
 """
     
     env_path = Path(".env")